@@ -0,0 +1,172 @@
+# backend/load_control.py
+import asyncio
+import json
+import os
+
+from starlette.exceptions import HTTPException
+
+RETRY_AFTER_SECONDS = int(os.getenv("LOAD_RETRY_AFTER", "5"))
+
+
+class RouteClass:
+    """Concurrency limit + bounded wait queue shared by a group of routes."""
+
+    def __init__(self, name, max_concurrent, max_queue, queue_timeout, max_body_bytes=None):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.max_body_bytes = max_body_bytes
+        self.semaphore = asyncio.Semaphore(max_concurrent)
+
+        # Counters exposed through /load-stats
+        self.active = 0
+        self.queued = 0
+        self.peak_queued = 0
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self.rejected_too_large = 0
+
+    async def acquire(self) -> bool:
+        """Waits for a slot. Returns False if the request should be shed."""
+        if not self.semaphore.locked():
+            # Free slot: acquire() returns without suspending
+            await self.semaphore.acquire()
+        elif self.queued >= self.max_queue:
+            self.rejected_queue_full += 1
+            return False
+        else:
+            self.queued += 1
+            self.peak_queued = max(self.peak_queued, self.queued)
+            try:
+                await asyncio.wait_for(self.semaphore.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.rejected_timeout += 1
+                return False
+            finally:
+                self.queued -= 1
+
+        self.active += 1
+        self.admitted += 1
+        return True
+
+    def release(self):
+        self.active -= 1
+        self.semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "max_body_bytes": self.max_body_bytes,
+            "active": self.active,
+            "queue_depth": self.queued,
+            "peak_queue_depth": self.peak_queued,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+            "rejected_too_large": self.rejected_too_large,
+        }
+
+
+# Heavy routes get their own budgets so a burst of video/biometric uploads
+# cannot starve cheap endpoints like /patient/profile. Unlisted routes are
+# not limited at all.
+ROUTE_CLASSES = {
+    "biometric_upload": RouteClass(
+        "biometric_upload",
+        max_concurrent=int(os.getenv("BIOMETRIC_MAX_CONCURRENT", "4")),
+        max_queue=int(os.getenv("BIOMETRIC_MAX_QUEUE", "8")),
+        queue_timeout=float(os.getenv("BIOMETRIC_QUEUE_TIMEOUT", "10")),
+        max_body_bytes=int(os.getenv("BIOMETRIC_MAX_UPLOAD_BYTES", str(25 * 1024 * 1024))),
+    ),
+    "qr_setup": RouteClass(
+        "qr_setup",
+        max_concurrent=int(os.getenv("QR_MAX_CONCURRENT", "4")),
+        max_queue=int(os.getenv("QR_MAX_QUEUE", "16")),
+        queue_timeout=float(os.getenv("QR_QUEUE_TIMEOUT", "5")),
+    ),
+}
+
+ROUTE_MAP = {
+    "/medical-staff/signup": "biometric_upload",
+    "/medical-staff/verify-biometric": "biometric_upload",
+    "/verify-admin-bio": "biometric_upload",
+    "/setup-2fa": "qr_setup",
+}
+
+
+def get_load_stats() -> dict:
+    return {name: route_class.stats() for name, route_class in ROUTE_CLASSES.items()}
+
+
+async def _send_error(send, status_code, detail, headers=None):
+    body = json.dumps({"detail": detail}).encode()
+    raw_headers = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+    ]
+    for key, value in (headers or {}).items():
+        raw_headers.append((key.lower().encode(), value.encode()))
+    await send({"type": "http.response.start", "status": status_code, "headers": raw_headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+class LoadSheddingMiddleware:
+    """Pure ASGI middleware enforcing per-route-class admission control.
+
+    Requests beyond a class's queue get an immediate 503 with Retry-After.
+    Upload size caps are checked against Content-Length and again while the
+    body streams in, so oversized uploads are cut off before being buffered.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        route_class = None
+        if scope["type"] == "http":
+            name = ROUTE_MAP.get(scope["path"].rstrip("/") or "/")
+            route_class = ROUTE_CLASSES.get(name)
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        limit = route_class.max_body_bytes
+        if limit is not None:
+            content_length = dict(scope["headers"]).get(b"content-length")
+            if content_length and content_length.isdigit() and int(content_length) > limit:
+                route_class.rejected_too_large += 1
+                await _send_error(send, 413, "Upload too large")
+                return
+
+        if not await route_class.acquire():
+            await _send_error(
+                send, 503, "Server busy, please retry",
+                headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+            )
+            return
+
+        try:
+            if limit is not None:
+                receive = self._capped_receive(receive, route_class)
+            await self.app(scope, receive, send)
+        finally:
+            route_class.release()
+
+    @staticmethod
+    def _capped_receive(receive, route_class):
+        received = 0
+
+        async def capped_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > route_class.max_body_bytes:
+                    route_class.rejected_too_large += 1
+                    raise HTTPException(status_code=413, detail="Upload too large")
+            return message
+
+        return capped_receive
@@ -6,22 +6,30 @@ import qrcode
 import random
 import time
 from fastapi import FastAPI, Request, HTTPException, File, UploadFile, Form
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 from authlib.integrations.starlette_client import OAuth
 from dotenv import load_dotenv
 
+# Load .env before internal imports: load_control reads its limits at import time
+load_dotenv()
+
 # Internal project imports
 from crypto import decrypt_data
 from database import get_record
+from load_control import LoadSheddingMiddleware, get_load_stats
 
 # MANDATORY: Allows OAuth to work over HTTP for local development
 os.environ['OAUTHLIB_INSECURE_TRANSPORT'] = '1'
 
-load_dotenv()
 app = FastAPI(title="Secure Healthcare Backend")
 
+# Admission control for heavy biometric routes (added first so it sits
+# inside CORS and 503/413 responses still carry CORS headers)
+app.add_middleware(LoadSheddingMiddleware)
+
 # CORS Setup for React Integration
 app.add_middleware(
     CORSMiddleware,
@@ -153,10 +161,8 @@ async def setup_2fa(request: Request):
     totp = pyotp.TOTP(SHARED_2FA_SECRET)
     auth_url = totp.provisioning_uri(name=user['email'], issuer_name="HealthcareSecure")
 
-    img = qrcode.make(auth_url)
-    buf = io.BytesIO()
-    img.save(buf)
-    img_base64 = base64.b64encode(buf.getvalue()).decode()
+    # QR rendering is CPU-bound; keep it off the event loop
+    img_base64 = await run_in_threadpool(render_qr_base64, auth_url)
 
     return {"qr_code": img_base64}
 
@@ -202,6 +208,13 @@ def view_record(record_id: str, request: Request):
         "audit": f"Accessed by {user['email']} as {role}"
     }
 
+@app.get("/load-stats")
+async def load_stats(request: Request):
+    """Per-route-class queue depth and rejection counters (verified admins only)."""
+    if request.session.get("role") != "admin" or not request.session.get('admin_verified'):
+        raise HTTPException(status_code=403, detail="Biometric verification required for Admins")
+    return get_load_stats()
+
 @app.get("/logout")
 async def logout(request: Request):
     request.session.clear()
@@ -424,9 +437,9 @@ async def medical_staff_signup(
         if any(staff['email'] == email for staff in medical_staff_db.values()):
             raise HTTPException(status_code=400, detail="Email already registered")
         
-        # Store biometric data in base64
-        face_data = base64.b64encode(await face_image.read()).decode()
-        voice_data = base64.b64encode(await voice_recording.read()).decode()
+        # Store biometric data in base64 (encoded in the threadpool)
+        face_data = await run_in_threadpool(encode_upload, await face_image.read())
+        voice_data = await run_in_threadpool(encode_upload, await voice_recording.read())
         
         # Create staff record
         staff_id = f"STAFF_{int(time.time())}"
@@ -490,13 +503,14 @@ async def verify_biometric(
         staff_id, staff = staff_record
         
         # Convert uploaded files to base64
-        new_face = base64.b64encode(await face_image.read()).decode()
-        new_voice = base64.b64encode(await voice_recording.read()).decode()
+        new_face = await run_in_threadpool(encode_upload, await face_image.read())
+        new_voice = await run_in_threadpool(encode_upload, await voice_recording.read())
         
         # Simple biometric verification (in production, use ML models)
         # For demo: check if data is similar (similarity > 60%)
-        face_match = calculate_similarity(new_face, staff['face_image'])
-        voice_match = calculate_similarity(new_voice, staff['voice_recording'])
+        # Comparison is CPU-bound, so run it in the threadpool
+        face_match = await run_in_threadpool(calculate_similarity, new_face, staff['face_image'])
+        voice_match = await run_in_threadpool(calculate_similarity, new_voice, staff['voice_recording'])
         
         if face_match > 0.6 and voice_match > 0.6:
             request.session['medical_staff_authenticated'] = True
@@ -545,7 +559,18 @@ async def medical_staff_logout(request: Request):
     request.session.clear()
     return {"status": "success", "message": "Logged out successfully"}
 
-# Helper function for biometric similarity
+# Helper functions for CPU-bound work (called via run_in_threadpool)
+def render_qr_base64(data: str) -> str:
+    """Render a QR code PNG and return it base64-encoded."""
+    img = qrcode.make(data)
+    buf = io.BytesIO()
+    img.save(buf)
+    return base64.b64encode(buf.getvalue()).decode()
+
+def encode_upload(data: bytes) -> str:
+    """Base64-encode uploaded biometric data for storage."""
+    return base64.b64encode(data).decode()
+
 def calculate_similarity(data1: str, data2: str) -> float:
     """Calculate similarity between two biometric data (demo implementation)."""
     # In production, use proper face recognition and voice analysis libraries
@@ -0,0 +1,139 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI, Request
+
+import load_control
+from load_control import LoadSheddingMiddleware, RouteClass
+
+
+@pytest.fixture
+def route_classes(monkeypatch):
+    """Small, fresh route classes so each test gets its own semaphores."""
+    classes = {
+        "biometric_upload": RouteClass(
+            "biometric_upload", max_concurrent=1, max_queue=1,
+            queue_timeout=5, max_body_bytes=1000,
+        ),
+        "qr_setup": RouteClass("qr_setup", max_concurrent=2, max_queue=1, queue_timeout=5),
+    }
+    monkeypatch.setattr(load_control, "ROUTE_CLASSES", classes)
+    monkeypatch.setattr(load_control, "RETRY_AFTER_SECONDS", 5)
+    return classes
+
+
+def make_app(delay=0.2):
+    app = FastAPI()
+    app.add_middleware(LoadSheddingMiddleware)
+
+    @app.post("/verify-admin-bio")
+    async def verify_admin_bio(request: Request):
+        body = await request.body()
+        await asyncio.sleep(delay)
+        return {"size": len(body)}
+
+    @app.get("/setup-2fa")
+    async def setup_2fa():
+        await asyncio.sleep(delay)
+        return {"qr_code": "ok"}
+
+    @app.get("/patient/profile")
+    async def patient_profile():
+        return {"name": "Patient"}
+
+    return app
+
+
+def run(app, requests):
+    """Runs request coroutines concurrently against the app."""
+    async def go():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*[request(client) for request in requests])
+
+    return asyncio.run(go())
+
+
+def test_requests_beyond_queue_get_503_with_retry_after(route_classes):
+    responses = run(make_app(), [lambda c: c.get("/setup-2fa") for _ in range(6)])
+
+    statuses = sorted(r.status_code for r in responses)
+    assert statuses == [200, 200, 200, 503, 503, 503]
+    for response in responses:
+        if response.status_code == 503:
+            assert response.headers["retry-after"] == "5"
+
+    stats = route_classes["qr_setup"].stats()
+    assert stats["admitted"] == 3
+    assert stats["rejected_queue_full"] == 3
+    assert stats["peak_queue_depth"] == 1
+    assert stats["active"] == 0
+    assert stats["queue_depth"] == 0
+
+
+def test_queue_timeout_gets_503(route_classes):
+    route_classes["qr_setup"].queue_timeout = 0.05
+
+    responses = run(make_app(), [lambda c: c.get("/setup-2fa") for _ in range(3)])
+
+    assert sorted(r.status_code for r in responses) == [200, 200, 503]
+    assert route_classes["qr_setup"].rejected_timeout == 1
+    assert route_classes["qr_setup"].rejected_queue_full == 0
+
+
+def test_content_length_over_cap_gets_413(route_classes):
+    [response] = run(make_app(), [lambda c: c.post("/verify-admin-bio", content=b"x" * 5000)])
+
+    assert response.status_code == 413
+    assert route_classes["biometric_upload"].rejected_too_large == 1
+    # Rejected before admission
+    assert route_classes["biometric_upload"].admitted == 0
+
+
+def test_streamed_body_over_cap_gets_413(route_classes):
+    async def chunks():
+        for _ in range(10):
+            yield b"x" * 500
+
+    [response] = run(make_app(), [lambda c: c.post("/verify-admin-bio", content=chunks())])
+
+    assert response.status_code == 413
+    assert route_classes["biometric_upload"].rejected_too_large == 1
+    assert route_classes["biometric_upload"].active == 0
+
+
+def test_body_under_cap_is_accepted(route_classes):
+    [response] = run(make_app(delay=0), [lambda c: c.post("/verify-admin-bio", content=b"x" * 500)])
+
+    assert response.status_code == 200
+    assert response.json() == {"size": 500}
+
+
+def test_cheap_routes_not_queued_behind_full_heavy_class(route_classes):
+    qr_setup = route_classes["qr_setup"]
+    app = make_app(delay=0.5)
+
+    async def scenario(client):
+        heavy = [asyncio.ensure_future(client.get("/setup-2fa")) for _ in range(3)]
+        # Let the heavy requests fill both slots and the one queue position
+        while qr_setup.active < 2 or qr_setup.queued < 1:
+            await asyncio.sleep(0.01)
+
+        cheap = await asyncio.gather(*[client.get("/patient/profile") for _ in range(10)])
+        # The cheap requests finished while the heavy class was still saturated
+        saturated = (qr_setup.active, qr_setup.queued)
+
+        await asyncio.gather(*heavy)
+        return cheap, saturated
+
+    async def go():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.wait_for(scenario(client), timeout=5)
+
+    cheap, saturated = asyncio.run(go())
+
+    assert all(r.status_code == 200 for r in cheap)
+    assert saturated == (2, 1)
+    assert load_control.get_load_stats()["biometric_upload"]["admitted"] == 0
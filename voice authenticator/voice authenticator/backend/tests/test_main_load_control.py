@@ -0,0 +1,126 @@
+"""Checks how load shedding is wired into the real app in main.py."""
+import asyncio
+import os
+
+import pytest
+
+pytest.importorskip("authlib")
+pytest.importorskip("python_multipart")
+
+import httpx
+
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+import load_control
+import main
+from load_control import RouteClass
+
+ORIGIN = "http://localhost:3000"
+
+SIGNUP_FORM = {
+    "name": "Dr. Test",
+    "email": "test@example.com",
+    "license_number": "LIC-1",
+    "department": "Cardiology",
+    "password": "secret",
+}
+
+
+@pytest.fixture
+def route_classes(monkeypatch):
+    classes = {
+        "biometric_upload": RouteClass(
+            "biometric_upload", max_concurrent=1, max_queue=1,
+            queue_timeout=5, max_body_bytes=1000,
+        ),
+        # No slots and no queue: every request is shed
+        "qr_setup": RouteClass("qr_setup", max_concurrent=0, max_queue=0, queue_timeout=5),
+    }
+    monkeypatch.setattr(load_control, "ROUTE_CLASSES", classes)
+    return classes
+
+
+def run(scenario):
+    async def go():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await scenario(client)
+
+    return asyncio.run(go())
+
+
+def test_503_carries_cors_headers(route_classes):
+    async def scenario(client):
+        return await client.get("/setup-2fa", headers={"Origin": ORIGIN})
+
+    response = run(scenario)
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == str(load_control.RETRY_AFTER_SECONDS)
+    assert response.headers["access-control-allow-origin"] == ORIGIN
+
+
+def test_413_carries_cors_headers(route_classes):
+    async def scenario(client):
+        return await client.post(
+            "/medical-staff/signup",
+            data=SIGNUP_FORM,
+            files={"face_image": ("face.png", b"x" * 5000), "voice_recording": ("voice.webm", b"v")},
+            headers={"Origin": ORIGIN},
+        )
+
+    response = run(scenario)
+
+    assert response.status_code == 413
+    assert response.headers["access-control-allow-origin"] == ORIGIN
+
+
+def test_streamed_multipart_over_cap_gets_413(route_classes):
+    boundary = "testboundary"
+
+    async def body():
+        for field, value in SIGNUP_FORM.items():
+            yield (
+                f'--{boundary}\r\nContent-Disposition: form-data; name="{field}"\r\n\r\n'
+                f"{value}\r\n"
+            ).encode()
+        yield (
+            f'--{boundary}\r\nContent-Disposition: form-data; name="face_image"; '
+            f'filename="face.png"\r\n\r\n'
+        ).encode()
+        for _ in range(10):
+            yield b"x" * 500
+        yield f"\r\n--{boundary}--\r\n".encode()
+
+    async def scenario(client):
+        # Streaming body: no Content-Length, so only capped_receive can reject it
+        return await client.post(
+            "/medical-staff/signup",
+            content=body(),
+            headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
+        )
+
+    response = run(scenario)
+
+    assert response.status_code == 413
+    assert route_classes["biometric_upload"].rejected_too_large == 1
+    assert route_classes["biometric_upload"].active == 0
+
+
+def test_load_stats_requires_verified_admin(route_classes):
+    async def scenario(client):
+        statuses = [(await client.get("/load-stats")).status_code]
+
+        # Self-selected admin role alone is not enough
+        await client.post("/select-role", json={"role": "admin"})
+        statuses.append((await client.get("/load-stats")).status_code)
+
+        await client.post("/verify-admin-bio", files={"video": ("video.webm", b"v")})
+        response = await client.get("/load-stats")
+        statuses.append(response.status_code)
+        return statuses, response.json()
+
+    statuses, stats = run(scenario)
+
+    assert statuses == [403, 403, 200]
+    assert set(stats) == {"biometric_upload", "qr_setup"}